@@ -1,5 +1,44 @@
 from django.contrib import admin
-from .models import Category, Product, Order, OrderItem
+from django.contrib.admin.utils import lookup_spawns_duplicates
+from django.db import connections
+from django.db.models import Q
+from .models import Category, Tag, Product, Order, OrderItem
+
+
+class TrigramSearchMixin:
+    """
+    On PostgreSQL, match search_fields with the trigram operator so the
+    pg_trgm GIN indexes are used instead of a LIKE '%term%' table scan
+    """
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term or connections[queryset.db].vendor != 'postgresql':
+            return super().get_search_results(request, queryset, search_term)
+        
+        query = Q()
+        for field_name in self.search_fields:
+            query |= Q(**{f'{field_name}__trigram_word_similar': search_term})
+        may_have_duplicates = any(
+            lookup_spawns_duplicates(self.opts, field_name)
+            for field_name in self.search_fields
+        )
+        return queryset.filter(query), may_have_duplicates
+
+
+class ChangelistOnlyMixin:
+    """
+    Load only `list_only_fields` on the changelist so large text columns
+    are not fetched for every row; the change form still loads everything
+    """
+    list_only_fields = ()
+    
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        match = request.resolver_match
+        changelist_url_name = f'{self.opts.app_label}_{self.opts.model_name}_changelist'
+        if self.list_only_fields and match and match.url_name == changelist_url_name:
+            queryset = queryset.only(*self.list_only_fields)
+        return queryset
+
 
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
@@ -7,23 +46,41 @@ class CategoryAdmin(admin.ModelAdmin):
     search_fields = ('name', 'description')
     list_filter = ('created_at', 'updated_at')
 
+@admin.register(Tag)
+class TagAdmin(admin.ModelAdmin):
+    list_display = ('name',)
+    search_fields = ('name',)
+
 @admin.register(Product)
-class ProductAdmin(admin.ModelAdmin):
+class ProductAdmin(TrigramSearchMixin, ChangelistOnlyMixin, admin.ModelAdmin):
     list_display = ('name', 'category', 'price', 'stock_quantity', 'status', 'created_at')
     list_filter = ('category', 'status', 'created_at')
-    search_fields = ('name', 'description', 'tags')
+    search_fields = ('name', 'description', 'tag_set__name')
     raw_id_fields = ('category',)
+    autocomplete_fields = ('tag_set',)
+    exclude = ('tags',)
+    list_select_related = ('category',)
+    list_only_fields = ('name', 'category__name', 'price', 'stock_quantity', 'status', 'created_at')
+
+class OrderItemInline(admin.TabularInline):
+    model = OrderItem
+    autocomplete_fields = ('product',)
+    readonly_fields = ('subtotal',)
+    extra = 0
 
 @admin.register(Order)
-class OrderAdmin(admin.ModelAdmin):
+class OrderAdmin(TrigramSearchMixin, ChangelistOnlyMixin, admin.ModelAdmin):
     list_display = ('order_number', 'customer_name', 'customer_email', 
                    'total_amount', 'status', 'payment_status', 'created_at')
     list_filter = ('status', 'payment_status', 'created_at')
     search_fields = ('order_number', 'customer_name', 'customer_email')
-    filter_horizontal = ('products',)
+    inlines = (OrderItemInline,)
+    list_only_fields = ('order_number', 'customer_name', 'customer_email',
+                        'total_amount', 'status', 'payment_status', 'created_at')
 
 @admin.register(OrderItem)
 class OrderItemAdmin(admin.ModelAdmin):
     list_display = ('order', 'product', 'quantity', 'unit_price', 'subtotal')
+    list_select_related = ('order', 'product')
     list_filter = ('order', 'product')
     search_fields = ('order__order_number', 'product__name')
\ No newline at end of file
@@ -0,0 +1,38 @@
+import uuid
+from functools import partial
+
+from django.core.cache import cache
+from django.db import transaction
+
+
+# Namespaces for cached API responses
+CATEGORIES_NAMESPACE = 'categories'
+PRODUCTS_NAMESPACE = 'products'
+ORDERS_NAMESPACE = 'orders'
+
+
+def _version_key(namespace):
+    return f'{namespace}:version'
+
+
+def namespace_version(namespace):
+    """Current version token of `namespace`; it changes on every invalidation"""
+    return cache.get_or_set(_version_key(namespace), uuid.uuid4().hex, None)
+
+
+def namespaced_key(namespace, suffix):
+    """
+    Build a cache key under the current version of `namespace`, so a whole
+    namespace can be invalidated without pattern deletes
+    """
+    return f'{namespace}:{namespace_version(namespace)}:{suffix}'
+
+
+def invalidate(*namespaces):
+    """
+    Drop every cached entry in the given namespaces once the current
+    transaction commits, so no request can re-cache the pre-commit rows
+    under the new version (and a rollback leaves the cache alone)
+    """
+    versions = {_version_key(namespace): uuid.uuid4().hex for namespace in namespaces}
+    transaction.on_commit(partial(cache.set_many, versions, None))
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from core.models import Tag, Product
+
+class Command(BaseCommand):
+    help = 'Copy comma-separated Product.tags values into Tag rows'
+
+    @transaction.atomic
+    def handle(self, *args, **kwargs):
+        products = list(Product.objects.exclude(tags='').only('id', 'tags'))
+        if not products:
+            self.stdout.write('No legacy tags to import.')
+            return
+
+        names_by_product = {
+            product.pk: {
+                name.strip().lower()[:50].rstrip()
+                for name in product.tags.split(',')
+                if name.strip()
+            }
+            for product in products
+        }
+        tags = {
+            tag.name: tag
+            for tag in Tag.for_names(set().union(*names_by_product.values()))
+        }
+
+        # Link every product to its tags with one through-table insert
+        ProductTag = Product.tag_set.through
+        ProductTag.objects.bulk_create(
+            [
+                ProductTag(product_id=product_id, tag_id=tags[name].pk)
+                for product_id, names in names_by_product.items()
+                for name in names
+            ],
+            ignore_conflicts=True
+        )
+        Product.objects.filter(pk__in=names_by_product).update(tags='')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported legacy tags for {len(products)} products ({len(tags)} tags)'
+        ))
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from django.db.models.functions import Lower
+from core.models import Order
+
+class Command(BaseCommand):
+    help = 'Lowercase customer emails stored before Order.save() normalized them'
+
+    def handle(self, *args, **kwargs):
+        updated = Order.objects.exclude(
+            customer_email=Lower('customer_email')
+        ).update(customer_email=Lower('customer_email'))
+        self.stdout.write(self.style.SUCCESS(f'Lowercased {updated} customer emails'))
@@ -1,12 +1,22 @@
 from django.core.management.base import BaseCommand
-from core.models import Category, Product, Order, OrderItem
+from django.db import connection, transaction
+from django.db.models import OuterRef, Subquery, Sum
+from django.utils import timezone
+from core.models import Category, Tag, Product, Order, OrderItem, OrderCounter
 import decimal
-from datetime import datetime, timedelta
+from datetime import timedelta
 import random
 
 class Command(BaseCommand):
     help = 'Seed the database with sample data'
 
+    def _validate(self, objs, exclude=None):
+        """Run model validation in Python once before a bulk insert"""
+        # Uniqueness and check constraints are enforced by the database on insert
+        for obj in objs:
+            obj.full_clean(exclude=exclude, validate_unique=False, validate_constraints=False)
+
+    @transaction.atomic
     def handle(self, *args, **kwargs):
         self.stdout.write('Seeding database...')
         
@@ -14,6 +24,7 @@ class Command(BaseCommand):
         OrderItem.objects.all().delete()
         Order.objects.all().delete()
         Product.objects.all().delete()
+        Tag.objects.all().delete()
         Category.objects.all().delete()
         
         # Create Categories
@@ -25,10 +36,10 @@ class Command(BaseCommand):
             {'name': 'Sports', 'description': 'Sports equipment and gear'},
         ]
         
-        category_objs = []
-        for cat_data in categories:
-            category = Category.objects.create(**cat_data)
-            category_objs.append(category)
+        category_objs = [Category(**cat_data) for cat_data in categories]
+        self._validate(category_objs)
+        Category.objects.bulk_create(category_objs)
+        for category in category_objs:
             self.stdout.write(f'Created category: {category.name}')
         
         # Create Products
@@ -38,7 +49,7 @@ class Command(BaseCommand):
                 'description': 'High-performance laptop with 16GB RAM, 512GB SSD',
                 'price': decimal.Decimal('1299.99'),
                 'stock_quantity': 25,
-                'tags': 'laptop,electronics,computer',
+                'tags': ['laptop', 'electronics', 'computer'],
                 'category': category_objs[0],
             },
             {
@@ -46,7 +57,7 @@ class Command(BaseCommand):
                 'description': 'Noise-cancelling wireless headphones',
                 'price': decimal.Decimal('199.99'),
                 'stock_quantity': 50,
-                'tags': 'audio,headphones,wireless',
+                'tags': ['audio', 'headphones', 'wireless'],
                 'category': category_objs[0],
             },
             {
@@ -54,7 +65,7 @@ class Command(BaseCommand):
                 'description': 'Latest smartphone with advanced camera',
                 'price': decimal.Decimal('899.99'),
                 'stock_quantity': 30,
-                'tags': 'phone,mobile,smartphone',
+                'tags': ['phone', 'mobile', 'smartphone'],
                 'category': category_objs[0],
             },
             {
@@ -62,7 +73,7 @@ class Command(BaseCommand):
                 'description': 'Complete guide to Python programming',
                 'price': decimal.Decimal('49.99'),
                 'stock_quantity': 100,
-                'tags': 'book,programming,python',
+                'tags': ['book', 'programming', 'python'],
                 'category': category_objs[1],
             },
             {
@@ -70,7 +81,7 @@ class Command(BaseCommand):
                 'description': 'Waterproof winter jacket with insulation',
                 'price': decimal.Decimal('129.99'),
                 'stock_quantity': 40,
-                'tags': 'clothing,winter,jacket',
+                'tags': ['clothing', 'winter', 'jacket'],
                 'category': category_objs[2],
             },
             {
@@ -78,7 +89,7 @@ class Command(BaseCommand):
                 'description': 'Complete set of gardening tools',
                 'price': decimal.Decimal('79.99'),
                 'stock_quantity': 60,
-                'tags': 'garden,tools,home',
+                'tags': ['garden', 'tools', 'home'],
                 'category': category_objs[3],
             },
             {
@@ -86,7 +97,7 @@ class Command(BaseCommand):
                 'description': 'Premium non-slip yoga mat',
                 'price': decimal.Decimal('34.99'),
                 'stock_quantity': 80,
-                'tags': 'sports,yoga,fitness',
+                'tags': ['sports', 'yoga', 'fitness'],
                 'category': category_objs[4],
             },
             {
@@ -94,15 +105,29 @@ class Command(BaseCommand):
                 'description': 'LED desk lamp with adjustable brightness',
                 'price': decimal.Decimal('29.99'),
                 'stock_quantity': 120,
-                'tags': 'home,office,lamp',
+                'tags': ['home', 'office', 'lamp'],
                 'category': category_objs[3],
             },
         ]
         
-        product_objs = []
-        for prod_data in products:
-            product = Product.objects.create(**prod_data)
-            product_objs.append(product)
+        product_tags = [prod_data.pop('tags') for prod_data in products]
+        product_objs = [Product(**prod_data) for prod_data in products]
+        # Categories are in memory already, skip the per-row FK existence query
+        self._validate(product_objs, exclude=['category'])
+        Product.objects.bulk_create(product_objs, batch_size=1000)
+        
+        # Create all tags, then link them to products with one insert
+        tags_by_name = {
+            tag.name: tag
+            for tag in Tag.for_names(name for names in product_tags for name in names)
+        }
+        ProductTag = Product.tag_set.through
+        ProductTag.objects.bulk_create([
+            ProductTag(product=product, tag=tags_by_name[name])
+            for product, names in zip(product_objs, product_tags)
+            for name in names
+        ], batch_size=1000)
+        for product in product_objs:
             self.stdout.write(f'Created product: {product.name} - ${product.price}')
         
         # Create Orders with OrderItems
@@ -116,55 +141,95 @@ class Command(BaseCommand):
         order_statuses = ['pending', 'processing', 'shipped', 'delivered']
         payment_statuses = ['pending', 'paid', 'paid', 'paid']
         
+        # Reserve a block of order numbers up front instead of one per order
+        num_orders = len(customers)
+        first_number = OrderCounter.allocate(num_orders)
+        
+        # Draw every random value in batches from one seeded generator, so the
+        # loop below only assembles instances and the fixtures are reproducible
+        rng = random.Random(42)
+        order_days = rng.choices(range(1, 31), k=num_orders)
+        order_status_draws = rng.choices(order_statuses, k=num_orders)
+        payment_status_draws = rng.choices(payment_statuses, k=num_orders)
+        street_numbers = rng.choices(range(100, 1000), k=num_orders)
+        zip_codes = rng.choices(range(10000, 100000), k=num_orders)
+        # Add 1-3 random products to each order
+        item_counts = rng.choices(range(1, 4), k=num_orders)
+        order_products = [rng.sample(product_objs, count) for count in item_counts]
+        quantities = iter(rng.choices(range(1, 4), k=sum(item_counts)))
+        
+        now = timezone.now()
+        order_objs = []
+        item_objs = []
+        
         for i, customer in enumerate(customers):
-            # Create order with past dates for variety
-            order_date = datetime.now() - timedelta(days=random.randint(1, 30))
-            
-            order = Order.objects.create(
+            order = Order(
+                order_number=f"ORD-{first_number + i:06d}",
+                # Past dates for variety
+                created_at=now - timedelta(days=order_days[i]),
                 customer_name=customer['name'],
                 customer_email=customer['email'],
                 customer_phone=customer['phone'],
                 total_amount=decimal.Decimal('0.00'),
-                status=random.choice(order_statuses),
-                payment_status=random.choice(payment_statuses),
-                shipping_address=f'{random.randint(100, 999)} Main St, City, State {random.randint(10000, 99999)}',
+                status=order_status_draws[i],
+                payment_status=payment_status_draws[i],
+                shipping_address=f'{street_numbers[i]} Main St, City, State {zip_codes[i]}',
                 notes='Thank you for your order!' if i % 2 == 0 else ''
             )
             
-            # Manually set created_at to simulate past orders
-            order.created_at = order_date
-            order.save()
-            
-            # Add 1-3 random products to order
-            num_items = random.randint(1, 3)
-            selected_products = random.sample(product_objs, num_items)
-            
-            total_amount = decimal.Decimal('0.00')
-            
-            for product in selected_products:
-                quantity = random.randint(1, 3)
-                subtotal = product.price * quantity
-                total_amount += subtotal
-                
-                OrderItem.objects.create(
+            for product in order_products[i]:
+                quantity = next(quantities)
+                item_objs.append(OrderItem(
                     order=order,
                     product=product,
                     quantity=quantity,
                     unit_price=product.price,
-                    subtotal=subtotal
-                )
-            
-            # Update order total
-            order.total_amount = total_amount
-            order.save()
+                    subtotal=product.price * quantity
+                ))
             
-            self.stdout.write(f'Created order: {order.order_number} for {order.customer_name} - ${order.total_amount}')
+            order_objs.append(order)
+        
+        self._validate(order_objs)
+        self._validate(item_objs, exclude=['order', 'product'])
+        
+        # auto_now_add would overwrite the backdated created_at on insert
+        created_at_field = Order._meta.get_field('created_at')
+        created_at_field.auto_now_add = False
+        try:
+            Order.objects.bulk_create(order_objs)
+        finally:
+            created_at_field.auto_now_add = True
+        OrderItem.objects.bulk_create(item_objs, batch_size=1000)
+        
+        # Roll item subtotals up into every order total with a single UPDATE
+        seeded_orders = Order.objects.filter(pk__in=[order.pk for order in order_objs])
+        order_totals = (
+            OrderItem.objects.filter(order=OuterRef('pk'))
+            .values('order')
+            .annotate(total=Sum('subtotal'))
+            .values('total')
+        )
+        seeded_orders.update(total_amount=Subquery(order_totals))
+        
+        for order_number, customer_name, total_amount in seeded_orders.order_by('order_number').values_list(
+            'order_number', 'customer_name', 'total_amount'
+        ):
+            self.stdout.write(f'Created order: {order_number} for {customer_name} - ${total_amount}')
         
         self.stdout.write(self.style.SUCCESS('Database seeding completed successfully!'))
         
-        # Display summary
+        # Display summary, counting every table in one round-trip
+        models = [Category, Product, Order, OrderItem]
+        count_sql = ', '.join(
+            f'(SELECT COUNT(*) FROM {connection.ops.quote_name(model._meta.db_table)})'
+            for model in models
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT {count_sql}')
+            categories_count, products_count, orders_count, items_count = cursor.fetchone()
+        
         self.stdout.write('\n📊 Database Summary:')
-        self.stdout.write(f'  Categories: {Category.objects.count()}')
-        self.stdout.write(f'  Products: {Product.objects.count()}')
-        self.stdout.write(f'  Orders: {Order.objects.count()}')
-        self.stdout.write(f'  Order Items: {OrderItem.objects.count()}')
\ No newline at end of file
+        self.stdout.write(f'  Categories: {categories_count}')
+        self.stdout.write(f'  Products: {products_count}')
+        self.stdout.write(f'  Orders: {orders_count}')
+        self.stdout.write(f'  Order Items: {items_count}')
\ No newline at end of file
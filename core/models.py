@@ -1,18 +1,59 @@
-from django.db import models
+from django.db import models, transaction
+from django.dispatch import Signal
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.core.exceptions import ValidationError
+from django.db.models.functions import Length, Round
+import os
+import time
 import uuid
 
+
+def uuid7():
+    """
+    Time-ordered UUID (RFC 9562 version 7), so new primary keys append to
+    the end of the index instead of landing on random B-tree pages
+    """
+    timestamp_ms = time.time_ns() // 1_000_000
+    rand = int.from_bytes(os.urandom(10), 'big')
+    value = (timestamp_ms & 0xFFFF_FFFF_FFFF) << 80
+    value |= 0x7 << 76                          # version
+    value |= (rand >> 68) << 64                 # rand_a, 12 bits
+    value |= 0b10 << 62                         # RFC 4122 variant
+    value |= rand & 0x3FFF_FFFF_FFFF_FFFF       # rand_b, 62 bits
+    return uuid.UUID(int=value)
+
+
+# Sent after QuerySet.update() and bulk_create(), which skip post_save
+bulk_changed = Signal()
+
+
+class BulkSignalQuerySet(models.QuerySet):
+    """QuerySet whose bulk writes send `bulk_changed` for their model"""
+    def update(self, **kwargs):
+        rows = super().update(**kwargs)
+        if rows:
+            bulk_changed.send(sender=self.model)
+        return rows
+    
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = super().bulk_create(objs, *args, **kwargs)
+        if objs:
+            bulk_changed.send(sender=self.model)
+        return objs
+
+
 class Category(models.Model):
     """
     Product Category Model
     """
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     name = models.CharField(max_length=100, unique=True)
     description = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = BulkSignalQuerySet.as_manager()
+    
     class Meta:
         verbose_name_plural = "Categories"
         ordering = ['name']
@@ -26,10 +67,29 @@ class Category(models.Model):
             raise ValidationError({'name': 'Category name is required'})
         if len(self.name) > 100:
             raise ValidationError({'name': 'Category name cannot exceed 100 characters'})
+
+
+class Tag(models.Model):
+    """
+    Product Tag Model
+    """
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
+    name = models.CharField(max_length=50, unique=True)
     
-    def save(self, *args, **kwargs):
-        self.full_clean()
-        super().save(*args, **kwargs)
+    objects = BulkSignalQuerySet.as_manager()
+    
+    class Meta:
+        ordering = ['name']
+    
+    def __str__(self):
+        return self.name
+    
+    @classmethod
+    def for_names(cls, names):
+        """Return tags for the given names, creating any that are missing"""
+        names = {name.strip().lower() for name in names if name.strip()}
+        cls.objects.bulk_create([cls(name=name) for name in names], ignore_conflicts=True)
+        return list(cls.objects.filter(name__in=names))
 
 
 class Product(models.Model):
@@ -42,7 +102,7 @@ class Product(models.Model):
         ('discontinued', 'Discontinued'),
     ]
     
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     category = models.ForeignKey(
         Category, 
         on_delete=models.CASCADE, 
@@ -64,15 +124,35 @@ class Product(models.Model):
         choices=STATUS_CHOICES, 
         default='active'
     )
+    # Comma-separated tags from before the Tag model. `manage.py import_legacy_tags`
+    # copies them into tag_set; the column is kept so upgrades don't lose them
     tags = models.CharField(max_length=255, blank=True)
+    tag_set = models.ManyToManyField(Tag, related_name='products', blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = BulkSignalQuerySet.as_manager()
+    
     class Meta:
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['status']),
             models.Index(fields=['category', 'status']),
+            models.Index(fields=['category', 'price'], name='prod_cat_price_idx'),
+            # Keyset pagination on the list endpoint
+            models.Index(fields=['-created_at', 'id']),
+            # Small partial index covering only the hot available_only=true path
+            models.Index(
+                fields=['-created_at', 'id'],
+                name='prod_available_idx',
+                condition=models.Q(status='active') & models.Q(stock_quantity__gt=0)
+            ),
+        ]
+        constraints = [
+            models.CheckConstraint(
+                check=models.Q(price__gte=0) & models.Q(stock_quantity__gte=0),
+                name='product_nonneg'
+            ),
         ]
     
     def __str__(self):
@@ -82,20 +162,45 @@ class Product(models.Model):
         """Model validation"""
         if not self.name:
             raise ValidationError({'name': 'Product name is required'})
-        if self.price < 0:
-            raise ValidationError({'price': 'Price cannot be negative'})
-        if self.stock_quantity < 0:
-            raise ValidationError({'stock_quantity': 'Stock quantity cannot be negative'})
-    
-    def save(self, *args, **kwargs):
-        self.full_clean()
-        super().save(*args, **kwargs)
     
     @property
     def is_available(self):
         return self.status == 'active' and self.stock_quantity > 0
 
 
+class OrderCounter(models.Model):
+    """
+    Single-row counter used to allocate sequential order numbers
+    """
+    next_value = models.PositiveIntegerField(default=1001)
+    
+    def __str__(self):
+        return f"Next order number: {self.next_value}"
+    
+    @classmethod
+    def allocate(cls, count=1):
+        """Reserve `count` consecutive order numbers and return the first one"""
+        with transaction.atomic():
+            counter, _ = cls.objects.select_for_update().get_or_create(
+                pk=1,
+                defaults={'next_value': cls._first_unused_value}
+            )
+            first = counter.next_value
+            counter.next_value += count
+            counter.save(update_fields=['next_value'])
+        return first
+    
+    @staticmethod
+    def _first_unused_value():
+        """Start a new counter after the highest order number already stored"""
+        last_order = Order.objects.order_by(
+            Length('order_number').desc(), '-order_number'
+        ).only('order_number').first()
+        if last_order is None:
+            return 1001
+        return int(last_order.order_number.split('-')[1]) + 1
+
+
 class Order(models.Model):
     """
     Order Model with ManyToMany relationship to Product
@@ -115,7 +220,7 @@ class Order(models.Model):
         ('refunded', 'Refunded'),
     ]
     
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     order_number = models.CharField(max_length=20, unique=True, editable=False)
     customer_name = models.CharField(max_length=100)
     customer_email = models.EmailField()
@@ -148,12 +253,22 @@ class Order(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = BulkSignalQuerySet.as_manager()
+    
     class Meta:
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['status']),
-            models.Index(fields=['customer_email']),
-            models.Index(fields=['created_at']),
+            # by_customer: equality on the email, newest first
+            models.Index(fields=['customer_email', '-created_at'], name='order_cust_created_idx'),
+            # Keyset pagination on the list endpoint
+            models.Index(fields=['-created_at', 'id']),
+        ]
+        constraints = [
+            models.CheckConstraint(
+                check=models.Q(total_amount__gte=0),
+                name='order_total_nonneg'
+            ),
         ]
     
     def __str__(self):
@@ -165,21 +280,14 @@ class Order(models.Model):
             raise ValidationError({'customer_name': 'Customer name is required'})
         if not self.customer_email:
             raise ValidationError({'customer_email': 'Customer email is required'})
-        if self.total_amount < 0:
-            raise ValidationError({'total_amount': 'Total amount cannot be negative'})
     
     def save(self, *args, **kwargs):
         if not self.order_number:
             # Generate order number on first save
-            last_order = Order.objects.order_by('-created_at').first()
-            if last_order and last_order.order_number:
-                last_num = int(last_order.order_number.split('-')[1])
-                new_num = last_num + 1
-            else:
-                new_num = 1001
-            self.order_number = f"ORD-{new_num:06d}"
+            self.order_number = f"ORD-{OrderCounter.allocate():06d}"
         
-        self.full_clean()
+        # Emails are stored lowercased so by_customer can use the plain index
+        self.customer_email = self.customer_email.lower()
         super().save(*args, **kwargs)
 
 
@@ -187,31 +295,39 @@ class OrderItem(models.Model):
     """
     Intermediate model for Order-Product ManyToMany relationship
     """
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
-    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='order_items')
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
+    # Lookups by order use the (order, product) unique index below
+    order = models.ForeignKey(
+        Order, 
+        on_delete=models.CASCADE, 
+        related_name='order_items',
+        db_index=False
+    )
     product = models.ForeignKey(Product, on_delete=models.CASCADE)
     quantity = models.IntegerField(validators=[MinValueValidator(1)])
     unit_price = models.DecimalField(max_digits=10, decimal_places=2)
     subtotal = models.DecimalField(max_digits=12, decimal_places=2)
     
+    objects = BulkSignalQuerySet.as_manager()
+    
     class Meta:
         unique_together = ['order', 'product']
+        constraints = [
+            models.CheckConstraint(
+                check=models.Q(quantity__gte=1) & models.Q(unit_price__gte=0),
+                name='orderitem_quantity_price_valid'
+            ),
+            # Round guards against float arithmetic on SQLite
+            models.CheckConstraint(
+                check=models.Q(subtotal=Round(models.F('quantity') * models.F('unit_price'), 2)),
+                name='orderitem_subtotal_matches'
+            ),
+        ]
     
     def __str__(self):
         return f"{self.quantity} x {self.product.name}"
     
-    def clean(self):
-        """Model validation"""
-        if self.quantity < 1:
-            raise ValidationError({'quantity': 'Quantity must be at least 1'})
-        if self.unit_price < 0:
-            raise ValidationError({'unit_price': 'Unit price cannot be negative'})
-        if self.subtotal != self.quantity * self.unit_price:
-            raise ValidationError({'subtotal': 'Subtotal must equal quantity * unit_price'})
-    
     def save(self, *args, **kwargs):
-        # Auto-calculate subtotal if not set
-        if not self.subtotal:
-            self.subtotal = self.quantity * self.unit_price
-        self.full_clean()
+        # Keep subtotal derived from quantity and unit price
+        self.subtotal = self.quantity * self.unit_price
         super().save(*args, **kwargs)
\ No newline at end of file
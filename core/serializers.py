@@ -1,11 +1,14 @@
 from rest_framework import serializers
-from .models import Category, Product, Order, OrderItem
+from django.db.models import Prefetch
+from .models import Category, Tag, Product, Order, OrderItem
 import uuid
 
 class CategorySerializer(serializers.ModelSerializer):
+    product_count = serializers.IntegerField(read_only=True)
+    
     class Meta:
         model = Category
-        fields = ['id', 'name', 'description', 'created_at', 'updated_at']
+        fields = ['id', 'name', 'description', 'product_count', 'created_at', 'updated_at']
         read_only_fields = ['id', 'created_at', 'updated_at']
     
     def validate_name(self, value):
@@ -15,8 +18,17 @@ class CategorySerializer(serializers.ModelSerializer):
         return value
 
 
+class TagListField(serializers.ListField):
+    """Read and write product tags as a list of names"""
+    child = serializers.CharField(max_length=50)
+    
+    def to_representation(self, value):
+        return [tag.name for tag in value.all()]
+
+
 class ProductSerializer(serializers.ModelSerializer):
     category_name = serializers.CharField(source='category.name', read_only=True)
+    tags = TagListField(source='tag_set', required=False)
     is_available = serializers.BooleanField(read_only=True)
     
     class Meta:
@@ -28,6 +40,11 @@ class ProductSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['id', 'created_at', 'updated_at', 'is_available']
     
+    @staticmethod
+    def setup_eager_loading(queryset):
+        """Join the category and prefetch tags to avoid N+1 queries"""
+        return queryset.select_related('category').prefetch_related('tag_set')
+    
     def validate_price(self, value):
         if value <= 0:
             raise serializers.ValidationError("Price must be greater than 0")
@@ -39,13 +56,80 @@ class ProductSerializer(serializers.ModelSerializer):
         return value
     
     def create(self, validated_data):
+        tags = validated_data.pop('tag_set', None)
         # Set default status if not provided
         if 'status' not in validated_data:
             validated_data['status'] = 'active'
-        return super().create(validated_data)
+        product = super().create(validated_data)
+        if tags is not None:
+            product.tag_set.set(Tag.for_names(tags))
+        return product
+    
+    def update(self, instance, validated_data):
+        tags = validated_data.pop('tag_set', None)
+        product = super().update(instance, validated_data)
+        if tags is not None:
+            product.tag_set.set(Tag.for_names(tags))
+        return product
+
+
+class ProductListSerializer(serializers.ModelSerializer):
+    """Narrow product representation for list views"""
+    category_name = serializers.CharField(source='category.name', read_only=True)
+    # Read from the SQL annotation the list actions add in ProductViewSet
+    is_available = serializers.BooleanField(source='available_sql', read_only=True)
+    
+    class Meta:
+        model = Product
+        fields = [
+            'id', 'category', 'category_name', 'name', 'price',
+            'stock_quantity', 'status', 'is_available', 'created_at'
+        ]
+        read_only_fields = fields
+    
+    @staticmethod
+    def setup_eager_loading(queryset):
+        """Join the category and select only the listed columns"""
+        return queryset.select_related('category').only(
+            'id', 'category__id', 'category__name', 'name', 'price',
+            'stock_quantity', 'status', 'created_at'
+        )
+
+
+class StockUpdateSerializer(serializers.Serializer):
+    id = serializers.UUIDField()
+    quantity = serializers.IntegerField(min_value=0)
+
+
+class BulkStockUpdateSerializer(serializers.Serializer):
+    """Payload of ProductViewSet.bulk_update_stock"""
+    updates = StockUpdateSerializer(many=True, allow_empty=False)
+    
+    def validate_updates(self, value):
+        ids = [update['id'] for update in value]
+        if len(ids) != len(set(ids)):
+            raise serializers.ValidationError("Each product may only appear once")
+        return value
+
+
+class ProductPrimaryKeyField(serializers.PrimaryKeyRelatedField):
+    """Resolve products from the `products_by_id` context when it is provided"""
+    def to_internal_value(self, data):
+        products_by_id = self.context.get('products_by_id')
+        if products_by_id is None:
+            return super().to_internal_value(data)
+        
+        try:
+            product = products_by_id.get(uuid.UUID(str(data)))
+        except (TypeError, ValueError, AttributeError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        if product is None:
+            self.fail('does_not_exist', pk_value=data)
+        return product
 
 
 class OrderItemSerializer(serializers.ModelSerializer):
+    product = ProductPrimaryKeyField(queryset=Product.objects.all())
     product_name = serializers.CharField(source='product.name', read_only=True)
     product_price = serializers.DecimalField(source='product.price', read_only=True, max_digits=10, decimal_places=2)
     
@@ -83,18 +167,78 @@ class OrderSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['id', 'order_number', 'created_at', 'updated_at']
     
+    ORDER_ITEM_UPDATE_FIELDS = ['quantity', 'unit_price', 'subtotal']
+    
+    @staticmethod
+    def setup_eager_loading(queryset):
+        """Load order items and their products up front to avoid N+1 queries"""
+        return queryset.prefetch_related(
+            Prefetch('order_items', queryset=OrderItem.objects.select_related('product'))
+        )
+    
     def validate_total_amount(self, value):
         if value <= 0:
             raise serializers.ValidationError("Total amount must be greater than 0")
         return value
     
+    def to_internal_value(self, data):
+        # Load every referenced product in one query for the item serializers
+        order_items_data = data.get('order_items') if hasattr(data, 'get') else None
+        if isinstance(order_items_data, list):
+            product_ids = set()
+            for item_data in order_items_data:
+                try:
+                    product_ids.add(uuid.UUID(str(item_data['product'])))
+                except (TypeError, ValueError, KeyError):
+                    continue
+            self.context['products_by_id'] = Product.objects.in_bulk(product_ids)
+        return super().to_internal_value(data)
+    
+    def validate(self, data):
+        order_items_data = data.get('order_items')
+        if not order_items_data:
+            return data
+        
+        # Items are matched by product, so every item needs one and only once
+        product_ids = set()
+        for item_data in order_items_data:
+            if 'product' not in item_data:
+                raise serializers.ValidationError({
+                    'order_items': 'Each item requires a product'
+                })
+            if item_data['product'].pk in product_ids:
+                raise serializers.ValidationError({
+                    'order_items': 'Each product may only appear once'
+                })
+            product_ids.add(item_data['product'].pk)
+        
+        # Partial updates may omit item fields, but new items need both to derive the subtotal
+        if self.instance is not None:
+            existing_product_ids = {item.product_id for item in self.instance.order_items.all()}
+            for item_data in order_items_data:
+                if item_data['product'].pk in existing_product_ids:
+                    continue
+                if 'quantity' not in item_data or 'unit_price' not in item_data:
+                    raise serializers.ValidationError({
+                        'order_items': 'New items require quantity and unit_price'
+                    })
+        return data
+    
+    @staticmethod
+    def _build_order_item(order, item_data):
+        # bulk_create() skips OrderItem.save(), so derive the subtotal here
+        item = OrderItem(order=order, **item_data)
+        item.subtotal = item.quantity * item.unit_price
+        return item
+    
     def create(self, validated_data):
         order_items_data = validated_data.pop('order_items', [])
         order = Order.objects.create(**validated_data)
         
         # Create order items
-        for item_data in order_items_data:
-            OrderItem.objects.create(order=order, **item_data)
+        OrderItem.objects.bulk_create(
+            [self._build_order_item(order, item_data) for item_data in order_items_data]
+        )
         
         return order
     
@@ -108,14 +252,62 @@ class OrderSerializer(serializers.ModelSerializer):
         
         # Update order items if provided
         if order_items_data is not None:
-            # Clear existing items
-            instance.order_items.all().delete()
-            
-            # Create new items
-            for item_data in order_items_data:
-                OrderItem.objects.create(order=instance, **item_data)
+            self._sync_order_items(instance, order_items_data)
         
         return instance
+    
+    def _sync_order_items(self, order, order_items_data):
+        """Apply only the item changes: insert new, update changed, delete removed"""
+        existing_items = {item.product_id: item for item in order.order_items.all()}
+        new_items = []
+        changed_items = []
+        
+        for item_data in order_items_data:
+            item = existing_items.pop(item_data['product'].pk, None)
+            if item is None:
+                new_items.append(self._build_order_item(order, item_data))
+                continue
+            
+            values = {
+                field: item_data[field]
+                for field in self.ORDER_ITEM_UPDATE_FIELDS
+                if field in item_data
+            }
+            if any(getattr(item, field) != value for field, value in values.items()):
+                for field, value in values.items():
+                    setattr(item, field, value)
+                # bulk_update() skips OrderItem.save(), so derive the subtotal here
+                item.subtotal = item.quantity * item.unit_price
+                changed_items.append(item)
+        
+        # Whatever is left was not in the payload
+        if existing_items:
+            OrderItem.objects.filter(
+                pk__in=[item.pk for item in existing_items.values()]
+            ).delete()
+        if changed_items:
+            OrderItem.objects.bulk_update(changed_items, self.ORDER_ITEM_UPDATE_FIELDS)
+        if new_items:
+            OrderItem.objects.bulk_create(new_items)
+
+
+class OrderListSerializer(OrderSerializer):
+    """Order representation for list views, without the long text fields"""
+    class Meta(OrderSerializer.Meta):
+        fields = [
+            'id', 'order_number', 'customer_name', 'customer_email',
+            'customer_phone', 'order_items', 'total_amount', 'status',
+            'payment_status', 'created_at', 'updated_at'
+        ]
+    
+    @staticmethod
+    def setup_eager_loading(queryset):
+        """Prefetch items and skip shipping_address and notes"""
+        return OrderSerializer.setup_eager_loading(queryset).only(
+            'id', 'order_number', 'customer_name', 'customer_email',
+            'customer_phone', 'total_amount', 'status', 'payment_status',
+            'created_at', 'updated_at'
+        )
 
 
 class OrderDetailSerializer(OrderSerializer):
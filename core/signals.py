@@ -0,0 +1,55 @@
+from django.db import connections
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+from .cache import CATEGORIES_NAMESPACE, ORDERS_NAMESPACE, PRODUCTS_NAMESPACE, invalidate
+from .models import Category, Tag, Product, Order, OrderItem, bulk_changed
+
+
+# Columns searched by the admin, backed by pg_trgm GIN indexes on PostgreSQL
+TRIGRAM_SEARCH_COLUMNS = [
+    (Product, 'name'),
+    (Product, 'description'),
+    (Tag, 'name'),
+    (Order, 'order_number'),
+    (Order, 'customer_name'),
+    (Order, 'customer_email'),
+]
+
+
+def create_search_indexes(sender, using='default', **kwargs):
+    """Create the trigram indexes used by admin search (PostgreSQL only)"""
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return
+    
+    with connection.cursor() as cursor:
+        cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        for model, column in TRIGRAM_SEARCH_COLUMNS:
+            table = model._meta.db_table
+            cursor.execute(
+                f'CREATE INDEX IF NOT EXISTS {table}_{column}_trgm '
+                f'ON {table} USING gin ({column} gin_trgm_ops)'
+            )
+
+
+# Cached API namespaces built from each model's rows
+CACHE_DEPENDENCIES = {
+    Category: (CATEGORIES_NAMESPACE, PRODUCTS_NAMESPACE),
+    Tag: (PRODUCTS_NAMESPACE,),
+    Product: (CATEGORIES_NAMESPACE, PRODUCTS_NAMESPACE, ORDERS_NAMESPACE),
+    Product.tag_set.through: (PRODUCTS_NAMESPACE,),
+    Order: (ORDERS_NAMESPACE,),
+    OrderItem: (ORDERS_NAMESPACE,),
+}
+
+
+def invalidate_dependent_caches(sender, **kwargs):
+    """Drop the cached responses built from `sender`'s rows"""
+    invalidate(*CACHE_DEPENDENCIES[sender])
+
+
+for model in CACHE_DEPENDENCIES:
+    post_save.connect(invalidate_dependent_caches, sender=model)
+    post_delete.connect(invalidate_dependent_caches, sender=model)
+    bulk_changed.connect(invalidate_dependent_caches, sender=model)
+m2m_changed.connect(invalidate_dependent_caches, sender=Product.tag_set.through)
@@ -1,9 +1,26 @@
-from django.test import TestCase
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
-from .models import Category, Product, Order
+from .models import Category, Tag, Product, Order, OrderCounter, OrderItem, uuid7
 import decimal
+import io
+import time
+
+LOCMEM_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+class UUID7Tests(TestCase):
+    def test_uuid7_version(self):
+        self.assertEqual(uuid7().version, 7)
+    
+    def test_uuid7_is_time_ordered(self):
+        first = uuid7()
+        time.sleep(0.002)
+        self.assertLess(first, uuid7())
+
 
 class CategoryModelTests(TestCase):
     def setUp(self):
@@ -42,6 +59,24 @@ class ProductModelTests(TestCase):
         self.assertEqual(self.product.price, decimal.Decimal("99.99"))
         self.assertTrue(self.product.is_available)
     
+    def test_import_legacy_tags(self):
+        self.product.tags = "Red, blue,,red"
+        self.product.save()
+        
+        call_command('import_legacy_tags', stdout=io.StringIO())
+        
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.tags, "")
+        self.assertEqual(
+            sorted(self.product.tag_set.values_list('name', flat=True)),
+            ["blue", "red"]
+        )
+    
+    def test_is_available_tracks_changes(self):
+        self.assertTrue(self.product.is_available)
+        self.product.stock_quantity = 0
+        self.assertFalse(self.product.is_available)
+    
     def test_product_unavailable(self):
         product = Product.objects.create(
             category=self.category,
@@ -76,6 +111,42 @@ class OrderModelTests(TestCase):
         self.assertEqual(self.order.customer_name, "John Doe")
         self.assertTrue(self.order.order_number.startswith("ORD-"))
     
+    def test_order_numbers_are_sequential(self):
+        next_order = Order.objects.create(
+            customer_name="Jane Doe",
+            customer_email="jane@example.com",
+            total_amount=decimal.Decimal("50.00"),
+            shipping_address="456 Test St"
+        )
+        first_num = int(self.order.order_number.split('-')[1])
+        next_num = int(next_order.order_number.split('-')[1])
+        self.assertEqual(next_num, first_num + 1)
+    
+    def test_order_counter_starts_after_existing_orders(self):
+        OrderCounter.objects.all().delete()
+        Order.objects.create(
+            order_number="ORD-005000",
+            customer_name="Jane Doe",
+            customer_email="jane@example.com",
+            total_amount=decimal.Decimal("50.00"),
+            shipping_address="456 Test St"
+        )
+        next_order = Order.objects.create(
+            customer_name="Jane Doe",
+            customer_email="jane@example.com",
+            total_amount=decimal.Decimal("50.00"),
+            shipping_address="456 Test St"
+        )
+        self.assertEqual(next_order.order_number, "ORD-005001")
+    
+    def test_lowercase_order_emails(self):
+        Order.objects.filter(pk=self.order.pk).update(customer_email="John@Example.com")
+        
+        call_command('lowercase_order_emails', stdout=io.StringIO())
+        
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.customer_email, "john@example.com")
+    
     def test_order_validation(self):
         order = Order(
             customer_name="",
@@ -99,6 +170,36 @@ class CategoryAPITests(APITestCase):
         response = self.client.get(self.url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
     
+    def test_get_categories_includes_product_count(self):
+        Product.objects.create(
+            category=self.category,
+            name="Test Product",
+            description="Test",
+            price=decimal.Decimal("10.00"),
+            stock_quantity=1
+        )
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'][0]['product_count'], 1)
+    
+    def test_delete_category_with_products_rejected(self):
+        Product.objects.create(
+            category=self.category,
+            name="Test Product",
+            description="Test",
+            price=decimal.Decimal("10.00"),
+            stock_quantity=1
+        )
+        url = reverse('category-detail', args=[self.category.id])
+        response = self.client.delete(url)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertTrue(Category.objects.filter(pk=self.category.pk).exists())
+    
+    def test_delete_empty_category(self):
+        url = reverse('category-detail', args=[self.category.id])
+        response = self.client.delete(url)
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+    
     def test_create_category(self):
         data = {
             "name": "New Category",
@@ -125,13 +226,167 @@ class ProductAPITests(APITestCase):
         response = self.client.get(self.url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
     
+    @override_settings(CACHES=LOCMEM_CACHES)
+    def test_product_list_cache_invalidated_on_create(self):
+        cache.clear()
+        response = self.client.get(self.url)
+        self.assertEqual(len(response.data['results']), 1)
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            Product.objects.create(
+                category=self.category,
+                name="Second Product",
+                description="Test",
+                price=decimal.Decimal("5.00"),
+                stock_quantity=1
+            )
+        response = self.client.get(self.url)
+        self.assertEqual(len(response.data['results']), 2)
+    
+    @override_settings(CACHES=LOCMEM_CACHES)
+    def test_unpaginated_staff_list_not_served_to_anonymous(self):
+        cache.clear()
+        staff = User.objects.create_user(username="staff", password="pass", is_staff=True)
+        self.client.force_authenticate(user=staff)
+        response = self.client.get(self.url, {'pagination': 'false'})
+        self.assertIsInstance(response.data, list)
+        
+        self.client.force_authenticate(user=None)
+        response = self.client.get(self.url, {'pagination': 'false'})
+        self.assertIn('results', response.data)
+    
+    @override_settings(CACHES=LOCMEM_CACHES)
+    def test_product_list_cache_invalidated_on_bulk_update(self):
+        cache.clear()
+        self.client.get(self.url)
+    
+        with self.captureOnCommitCallbacks(execute=True):
+            Product.objects.filter(pk=self.product.pk).update(name="Renamed Product")
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['results'][0]['name'], "Renamed Product")
+    
+    @override_settings(CACHES=LOCMEM_CACHES)
+    def test_product_list_cache_invalidated_on_tag_rename(self):
+        cache.clear()
+        tag = Tag.objects.create(name="home")
+        self.product.tag_set.add(tag)
+        response = self.client.get(f'{self.url}?tag=home')
+        self.assertEqual(len(response.data['results']), 1)
+    
+        tag.name = "garden"
+        with self.captureOnCommitCallbacks(execute=True):
+            tag.save()
+        response = self.client.get(f'{self.url}?tag=home')
+        self.assertEqual(len(response.data['results']), 0)
+    
+    @override_settings(CACHES=LOCMEM_CACHES)
+    def test_product_list_conditional_get(self):
+        cache.clear()
+        response = self.client.get(self.url)
+        etag = response['ETag']
+        
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            self.product.delete()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+    
     def test_filter_products(self):
         response = self.client.get(f'{self.url}?category={self.category.id}')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
     
+    def test_filter_products_by_availability(self):
+        Product.objects.create(
+            category=self.category,
+            name="Out of Stock",
+            description="Test",
+            price=decimal.Decimal("10.00"),
+            stock_quantity=0
+        )
+        response = self.client.get(f'{self.url}?is_available=false')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertFalse(response.data['results'][0]['is_available'])
+    
+    def test_filter_products_by_price(self):
+        response = self.client.get(f'{self.url}?min_price=50&max_price=100')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 1)
+        
+        response = self.client.get(f'{self.url}?min_price=abc')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+    
+    def test_update_stock(self):
+        url = reverse('product-update-stock', args=[self.product.id])
+        response = self.client.post(url, {'quantity': 3}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['stock_quantity'], 3)
+    
+    def test_update_stock_delta(self):
+        url = reverse('product-update-stock', args=[self.product.id])
+        response = self.client.post(url, {'delta': -4}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['stock_quantity'], 6)
+        
+        response = self.client.post(url, {'delta': -7}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock_quantity, 6)
+    
+    def test_bulk_update_stock(self):
+        other = Product.objects.create(
+            category=self.category,
+            name="Second Product",
+            description="Test",
+            price=decimal.Decimal("5.00"),
+            stock_quantity=1
+        )
+        url = reverse('product-bulk-update-stock')
+        data = {'updates': [
+            {'id': str(self.product.id), 'quantity': 0},
+            {'id': str(other.id), 'quantity': 25}
+        ]}
+        response = self.client.post(url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['updated'], 2)
+        self.product.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual(self.product.stock_quantity, 0)
+        self.assertEqual(other.stock_quantity, 25)
+    
+    def test_bulk_update_stock_unknown_product(self):
+        url = reverse('product-bulk-update-stock')
+        data = {'updates': [
+            {'id': str(self.product.id), 'quantity': 0},
+            {'id': str(uuid7()), 'quantity': 5}
+        ]}
+        response = self.client.post(url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock_quantity, 10)
+    
     def test_search_products(self):
         response = self.client.get(f'{self.url}?search=Test')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
+    
+    def test_create_product_with_tags(self):
+        data = {
+            "category": str(self.category.id),
+            "name": "Tagged Product",
+            "description": "Test",
+            "price": "19.99",
+            "stock_quantity": 5,
+            "tags": ["Audio", "wireless"]
+        }
+        response = self.client.post(self.url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(sorted(response.data['tags']), ["audio", "wireless"])
+        
+        response = self.client.get(f'{self.url}?tag=audio')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 1)
 
 
 class OrderAPITests(APITestCase):
@@ -157,6 +412,172 @@ class OrderAPITests(APITestCase):
         response = self.client.get(self.url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
     
+    @override_settings(CACHES=LOCMEM_CACHES)
+    def test_order_list_etag_changes_with_item_products(self):
+        cache.clear()
+        response = self.client.get(self.url)
+        etag = response['ETag']
+        
+        self.product.name = "Renamed Product"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.product.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+    
+    def test_get_orders_includes_item_products(self):
+        OrderItem.objects.create(
+            order=self.order,
+            product=self.product,
+            quantity=2,
+            unit_price=self.product.price
+        )
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        item = response.data['results'][0]['order_items'][0]
+        self.assertEqual(item['product_name'], "Test Product")
+    
+    def test_create_order_with_items(self):
+        data = {
+            "customer_name": "Jane Doe",
+            "customer_email": "jane@example.com",
+            "total_amount": "100.00",
+            "shipping_address": "456 Test St",
+            "order_items": [
+                {"product": str(self.product.id), "quantity": 2, "unit_price": "50.00"}
+            ]
+        }
+        response = self.client.post(self.url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        item = OrderItem.objects.get(order__customer_email="jane@example.com")
+        self.assertEqual(item.subtotal, decimal.Decimal("100.00"))
+    
+    def test_create_order_with_unknown_product(self):
+        data = {
+            "customer_name": "Jane Doe",
+            "customer_email": "jane@example.com",
+            "total_amount": "100.00",
+            "shipping_address": "456 Test St",
+            "order_items": [
+                {"product": "00000000-0000-0000-0000-000000000000", "quantity": 2, "unit_price": "50.00"}
+            ]
+        }
+        response = self.client.post(self.url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+    
+    def test_update_order_items_keeps_unchanged_rows(self):
+        other_product = Product.objects.create(
+            category=self.category,
+            name="Other Product",
+            description="Test",
+            price=decimal.Decimal("25.00"),
+            stock_quantity=10
+        )
+        kept_item = OrderItem.objects.create(
+            order=self.order,
+            product=self.product,
+            quantity=2,
+            unit_price=self.product.price
+        )
+        OrderItem.objects.create(
+            order=self.order,
+            product=other_product,
+            quantity=1,
+            unit_price=other_product.price
+        )
+        
+        data = {
+            "order_items": [
+                {"product": str(self.product.id), "quantity": 3, "unit_price": "50.00"}
+            ]
+        }
+        url = reverse('order-detail', args=[self.order.id])
+        response = self.client.patch(url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        
+        items = list(self.order.order_items.all())
+        self.assertEqual(len(items), 1)
+        self.assertEqual(items[0].pk, kept_item.pk)
+        self.assertEqual(items[0].quantity, 3)
+        self.assertEqual(items[0].subtotal, decimal.Decimal("150.00"))
+    
+    def test_update_order_item_quantity_only(self):
+        item = OrderItem.objects.create(
+            order=self.order,
+            product=self.product,
+            quantity=2,
+            unit_price=self.product.price
+        )
+        
+        data = {"order_items": [{"product": str(self.product.id), "quantity": 3}]}
+        url = reverse('order-detail', args=[self.order.id])
+        response = self.client.patch(url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        
+        item.refresh_from_db()
+        self.assertEqual(item.quantity, 3)
+        self.assertEqual(item.subtotal, decimal.Decimal("150.00"))
+    
+    def test_update_order_items_requires_product(self):
+        data = {"order_items": [{"quantity": 3}]}
+        url = reverse('order-detail', args=[self.order.id])
+        response = self.client.patch(url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+    
+    def test_update_order_items_rejects_duplicate_products(self):
+        item_data = {"product": str(self.product.id), "quantity": 1, "unit_price": "50.00"}
+        data = {"order_items": [item_data, item_data]}
+        url = reverse('order-detail', args=[self.order.id])
+        response = self.client.patch(url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+    
+    def test_by_customer_streams_unpaginated_for_staff(self):
+        staff = User.objects.create_user(username="staff", password="pass", is_staff=True)
+        self.client.force_authenticate(user=staff)
+        
+        url = reverse('order-by-customer')
+        response = self.client.get(url, {'email': 'john@example.com', 'pagination': 'false'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = b''.join(response.streaming_content).splitlines()
+        self.assertEqual(len(lines), 1)
+    
+    def test_by_customer_ignores_pagination_opt_out_for_anonymous(self):
+        url = reverse('order-by-customer')
+        response = self.client.get(url, {'email': 'john@example.com', 'pagination': 'false'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('results', response.data)
+    
+    def test_by_customer_matches_email_case_insensitively(self):
+        data = {
+            "customer_name": "Jane Doe",
+            "customer_email": "Jane.Doe@Example.com",
+            "total_amount": "100.00",
+            "shipping_address": "456 Test St",
+            "order_items": [
+                {"product": str(self.product.id), "quantity": 2, "unit_price": "50.00"}
+            ]
+        }
+        response = self.client.post(self.url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['customer_email'], "jane.doe@example.com")
+        
+        url = reverse('order-by-customer')
+        response = self.client.get(url, {'email': 'JANE.DOE@example.com'})
+        self.assertEqual(len(response.data['results']), 1)
+    
+    def test_update_status(self):
+        url = reverse('order-update-status', args=[self.order.id])
+        response = self.client.post(url, {'status': 'shipped'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.status, 'shipped')
+    
+    def test_update_status_invalid(self):
+        url = reverse('order-update-status', args=[self.order.id])
+        response = self.client.post(url, {'status': 'lost'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('pending', response.data['error'])
+    
     def test_filter_by_status(self):
         response = self.client.get(f'{self.url}?status=pending')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
\ No newline at end of file
@@ -1,26 +1,141 @@
+import hashlib
+from decimal import Decimal, InvalidOperation
+from functools import partial, wraps
+
 from rest_framework import viewsets, filters, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.renderers import JSONRenderer
+from rest_framework.pagination import CursorPagination, PageNumberPagination
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Q, Prefetch
+from django.db.models import BooleanField, Count, ExpressionWrapper, F, Q
 from django.shortcuts import get_object_or_404
+from django.core.cache import cache
+from django.db import transaction
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
 
+from .cache import (
+    CATEGORIES_NAMESPACE,
+    ORDERS_NAMESPACE,
+    PRODUCTS_NAMESPACE,
+    namespace_version,
+    namespaced_key
+)
 from .models import Category, Product, Order
 from .serializers import (
     CategorySerializer,
     ProductSerializer,
+    ProductListSerializer,
+    BulkStockUpdateSerializer,
     OrderSerializer,
+    OrderListSerializer,
     OrderDetailSerializer
 )
 
-class StandardResultsSetPagination(PageNumberPagination):
+# Built once at import; Order.STATUS_CHOICES never changes at runtime
+_VALID_ORDER_STATUSES = frozenset(dict(Order.STATUS_CHOICES))
+_VALID_ORDER_STATUSES_LIST = [value for value, _ in Order.STATUS_CHOICES]
+
+def memoized_queryset(get_queryset):
+    """
+    Build a viewset's queryset once per request. Viewset instances live for
+    a single request, so parameter parsing and filter construction run only
+    once; each caller still gets its own clone.
+    """
+    @wraps(get_queryset)
+    def wrapper(self):
+        if not hasattr(self, '_cached_queryset'):
+            self._cached_queryset = get_queryset(self)
+        return self._cached_queryset.all()
+    return wrapper
+
+
+class OptionalPaginationMixin:
+    """Let staff users fetch a whole result set with ?pagination=false"""
+    def paginate_queryset(self, queryset, request, view=None):
+        if request.query_params.get('pagination') == 'false' and request.user.is_staff:
+            return None
+        return super().paginate_queryset(queryset, request, view)
+
+
+class StandardResultsSetPagination(OptionalPaginationMixin, PageNumberPagination):
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class StandardCursorPagination(OptionalPaginationMixin, CursorPagination):
+    """
+    Keyset pagination on created_at: no COUNT(*) and no OFFSET scan,
+    so deep pages cost the same as the first one
+    """
     page_size = 10
     page_size_query_param = 'page_size'
     max_page_size = 100
+    ordering = '-created_at'
+    cursor_query_param = 'cursor'
 
 
-class CategoryViewSet(viewsets.ModelViewSet):
+class ConditionalListMixin:
+    """
+    Answer list GETs with 304 Not Modified when the client already has the
+    current page. The ETag is derived from the version of `cache_namespace`,
+    which every write to the listed data bumps, so validating a request
+    costs a single cache read and no query. Without a shared cache the
+    version is not stored and every request gets a full response.
+    """
+    cache_namespace = None
+    
+    def list_etag(self, request):
+        parts = [
+            namespace_version(self.cache_namespace),
+            str(request.user.is_staff),
+            request.get_full_path()
+        ]
+        return quote_etag(hashlib.md5('|'.join(parts).encode()).hexdigest())
+    
+    def list(self, request, *args, **kwargs):
+        etag = self.list_etag(request)
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            return not_modified
+        
+        response = super().list(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            response['ETag'] = etag
+        return response
+
+
+class CachedResponseMixin:
+    """
+    Serve read responses from the cache, keyed by the full request path.
+    Entries are invalidated by the model signals in core.signals.
+    """
+    cache_namespace = None
+    cache_timeout = 300
+    
+    def cached_response(self, request, build_response, timeout=None):
+        # Staff may opt out of pagination, so their responses are cached separately
+        suffix = f'staff={request.user.is_staff}:{request.get_full_path()}'
+        key = namespaced_key(self.cache_namespace, suffix)
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+        
+        response = build_response()
+        if response.status_code == status.HTTP_200_OK:
+            cache.set(key, response.data, timeout or self.cache_timeout)
+        return response
+    
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(request, partial(super().list, request, *args, **kwargs))
+
+
+class CategoryViewSet(ConditionalListMixin, CachedResponseMixin, viewsets.ModelViewSet):
     """
     ViewSet for Category model.
     Provides CRUD operations for categories.
@@ -28,14 +143,20 @@ class CategoryViewSet(viewsets.ModelViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     pagination_class = StandardResultsSetPagination
+    cache_namespace = CATEGORIES_NAMESPACE
+    cache_timeout = 3600
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['name', 'description']
     ordering_fields = ['name', 'created_at']
     ordering = ['name']
     
+    @memoized_queryset
     def get_queryset(self):
         """Optimize queryset for list view"""
-        return Category.objects.prefetch_related('products').all()
+        # Mutations only need the row itself, not the product count join
+        if self.action in ('destroy', 'update', 'partial_update'):
+            return Category.objects.all()
+        return Category.objects.annotate(product_count=Count('products'))
     
     def destroy(self, request, *args, **kwargs):
         """Override delete to handle related products"""
@@ -52,46 +173,92 @@ class CategoryViewSet(viewsets.ModelViewSet):
         return super().destroy(request, *args, **kwargs)
 
 
-class ProductViewSet(viewsets.ModelViewSet):
+class ProductViewSet(ConditionalListMixin, CachedResponseMixin, viewsets.ModelViewSet):
     """
     ViewSet for Product model.
     Provides CRUD operations with filtering and search.
     """
-    queryset = Product.objects.all()
+    queryset = Product.objects.select_related('category')
     serializer_class = ProductSerializer
-    pagination_class = StandardResultsSetPagination
+    pagination_class = StandardCursorPagination
+    cache_namespace = PRODUCTS_NAMESPACE
+    cache_timeout = 300
+    active_cache_timeout = 120
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['category', 'status']
-    search_fields = ['name', 'description', 'tags']
-    ordering_fields = ['price', 'stock_quantity', 'created_at', 'name']
+    search_fields = ['name', 'description', 'tag_set__name']
+    ordering_fields = ['price', 'stock_quantity', 'created_at', 'name', 'available_sql']
     ordering = ['-created_at']
     
+    def get_serializer_class(self):
+        """Use the narrow serializer for list views"""
+        if self.action in ('list', 'active'):
+            return ProductListSerializer
+        return ProductSerializer
+    
+    @memoized_queryset
     def get_queryset(self):
         """Optimize queryset and apply additional filters"""
-        queryset = Product.objects.select_related('category').all()
+        queryset = self.get_serializer_class().setup_eager_loading(Product.objects.all())
         
         # Custom filters
-        min_price = self.request.query_params.get('min_price')
-        max_price = self.request.query_params.get('max_price')
+        min_price = self._decimal_param('min_price')
+        max_price = self._decimal_param('max_price')
         category_id = self.request.query_params.get('category_id')
+        tag = self.request.query_params.get('tag')
         
-        if min_price:
+        if min_price is not None:
             queryset = queryset.filter(price__gte=min_price)
-        if max_price:
+        if max_price is not None:
             queryset = queryset.filter(price__lte=max_price)
         if category_id:
             queryset = queryset.filter(category_id=category_id)
+        if tag:
+            queryset = queryset.filter(tag_set__name=tag.strip().lower())
         
         # Filter by availability
         available_only = self.request.query_params.get('available_only')
         if available_only and available_only.lower() == 'true':
             queryset = queryset.filter(status='active', stock_quantity__gt=0)
         
+        # List actions compute availability in SQL so it can be filtered and ordered on.
+        # The annotation has its own name so Product.is_available stays a live property.
+        if self.action in ('list', 'active'):
+            queryset = queryset.annotate(
+                available_sql=ExpressionWrapper(
+                    Q(status='active', stock_quantity__gt=0),
+                    output_field=BooleanField()
+                )
+            )
+            is_available = self.request.query_params.get('is_available')
+            if is_available:
+                queryset = queryset.filter(available_sql=is_available.lower() == 'true')
+        
         return queryset
     
+    def _decimal_param(self, name):
+        """Parse a numeric query parameter so the filter compares against a typed value"""
+        value = self.request.query_params.get(name)
+        if not value:
+            return None
+        try:
+            value = Decimal(value)
+        except InvalidOperation:
+            raise ValidationError({name: 'A valid number is required.'})
+        if not value.is_finite():
+            raise ValidationError({name: 'A valid number is required.'})
+        return value
+    
     @action(detail=False, methods=['get'])
     def active(self, request):
         """Get active products only"""
+        return self.cached_response(
+            request,
+            partial(self._active_response, request),
+            timeout=self.active_cache_timeout
+        )
+    
+    def _active_response(self, request):
         active_products = self.get_queryset().filter(status='active')
         page = self.paginate_queryset(active_products)
         
@@ -104,9 +271,13 @@ class ProductViewSet(viewsets.ModelViewSet):
     
     @action(detail=True, methods=['post'])
     def update_stock(self, request, pk=None):
-        """Update product stock quantity"""
+        """Update product stock quantity, or adjust it by `delta`"""
         product = self.get_object()
         quantity = request.data.get('quantity')
+        delta = request.data.get('delta')
+        
+        if delta is not None:
+            return self._adjust_stock(product, delta)
         
         if quantity is None:
             return Response(
@@ -118,7 +289,7 @@ class ProductViewSet(viewsets.ModelViewSet):
             quantity = int(quantity)
             product.stock_quantity = quantity
             product.full_clean()
-            product.save()
+            product.save(update_fields=['stock_quantity', 'updated_at'])
             
             serializer = self.get_serializer(product)
             return Response(serializer.data)
@@ -132,15 +303,73 @@ class ProductViewSet(viewsets.ModelViewSet):
                 {'error': str(e)},
                 status=status.HTTP_400_BAD_REQUEST
             )
+    
+    def _adjust_stock(self, product, delta):
+        """Apply a relative stock change in the database, without a read-modify-write race"""
+        try:
+            delta = int(delta)
+        except (ValueError, TypeError):
+            return Response(
+                {'error': 'Delta must be a valid integer'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        updated = Product.objects.filter(
+            pk=product.pk,
+            stock_quantity__gte=-delta
+        ).update(
+            stock_quantity=F('stock_quantity') + delta,
+            updated_at=timezone.now()
+        )
+        if not updated:
+            return Response(
+                {'error': 'Stock quantity cannot be negative'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        product.refresh_from_db(fields=['stock_quantity', 'updated_at'])
+        serializer = self.get_serializer(product)
+        return Response(serializer.data)
+    
+    @action(detail=False, methods=['post'])
+    def bulk_update_stock(self, request):
+        """Set the stock quantity of many products in one request"""
+        serializer = BulkStockUpdateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        quantities = {
+            update['id']: update['quantity']
+            for update in serializer.validated_data['updates']
+        }
+        
+        with transaction.atomic():
+            products = list(
+                Product.objects.filter(pk__in=quantities).only('id', 'stock_quantity', 'updated_at')
+            )
+            missing = set(quantities) - {product.pk for product in products}
+            if missing:
+                return Response(
+                    {'error': 'Products not found', 'ids': sorted(str(pk) for pk in missing)},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            
+            # bulk_update() skips auto_now, so stamp updated_at here
+            now = timezone.now()
+            for product in products:
+                product.stock_quantity = quantities[product.pk]
+                product.updated_at = now
+            Product.objects.bulk_update(products, ['stock_quantity', 'updated_at'], batch_size=500)
+        
+        return Response({'updated': len(products)})
 
 
-class OrderViewSet(viewsets.ModelViewSet):
+class OrderViewSet(ConditionalListMixin, viewsets.ModelViewSet):
     """
     ViewSet for Order model.
     Provides CRUD operations with filtering and search.
     """
     queryset = Order.objects.all()
-    pagination_class = StandardResultsSetPagination
+    pagination_class = StandardCursorPagination
+    cache_namespace = ORDERS_NAMESPACE
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['status', 'payment_status']
     search_fields = ['customer_name', 'customer_email', 'order_number']
@@ -148,17 +377,19 @@ class OrderViewSet(viewsets.ModelViewSet):
     ordering = ['-created_at']
     
     def get_serializer_class(self):
-        """Use different serializer for detail view"""
+        """Use different serializer for detail and list views"""
         if self.action == 'retrieve':
             return OrderDetailSerializer
+        if self.action == 'list':
+            return OrderListSerializer
         return OrderSerializer
     
+    @memoized_queryset
     def get_queryset(self):
         """Optimize queryset with prefetching"""
-        return Order.objects.prefetch_related(
-            Prefetch('order_items', queryset=OrderItem.objects.select_related('product'))
-        ).all()
+        return self.get_serializer_class().setup_eager_loading(Order.objects.all())
     
+    @transaction.atomic
     def create(self, request, *args, **kwargs):
         """Override create to handle order items"""
         serializer = self.get_serializer(data=request.data)
@@ -186,8 +417,9 @@ class OrderViewSet(viewsets.ModelViewSet):
         
         order = serializer.save()
         
-        # Return detailed response
-        detail_serializer = OrderDetailSerializer(order)
+        # Return detailed response, reloading the order with its items prefetched
+        order = OrderDetailSerializer.setup_eager_loading(Order.objects.all()).get(pk=order.pk)
+        detail_serializer = OrderDetailSerializer(order, context=self.get_serializer_context())
         return Response(detail_serializer.data, status=status.HTTP_201_CREATED)
     
     @action(detail=True, methods=['post'])
@@ -203,15 +435,14 @@ class OrderViewSet(viewsets.ModelViewSet):
             )
         
         # Validate status choice
-        valid_statuses = dict(Order.STATUS_CHOICES).keys()
-        if new_status not in valid_statuses:
+        if new_status not in _VALID_ORDER_STATUSES:
             return Response(
-                {'error': f'Invalid status. Valid choices are: {list(valid_statuses)}'},
+                {'error': f'Invalid status. Valid choices are: {_VALID_ORDER_STATUSES_LIST}'},
                 status=status.HTTP_400_BAD_REQUEST
             )
         
         order.status = new_status
-        order.save()
+        order.save(update_fields=['status', 'updated_at'])
         
         serializer = self.get_serializer(order)
         return Response(serializer.data)
@@ -227,12 +458,17 @@ class OrderViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        orders = self.get_queryset().filter(customer_email=email)
+        orders = self.get_queryset().filter(customer_email=email.lower())
         page = self.paginate_queryset(orders)
         
         if page is not None:
             serializer = self.get_serializer(page, many=True)
             return self.get_paginated_response(serializer.data)
         
-        serializer = self.get_serializer(orders, many=True)
-        return Response(serializer.data)
\ No newline at end of file
+        # Unpaginated exports are streamed as NDJSON so memory stays bounded
+        renderer = JSONRenderer()
+        lines = (
+            renderer.render(self.get_serializer(order).data) + b'\n'
+            for order in orders.iterator(chunk_size=500)
+        )
+        return StreamingHttpResponse(lines, content_type='application/x-ndjson')
\ No newline at end of file